@@ -0,0 +1,149 @@
+"""Generate a synthetic image archive for benchmarking.
+
+The archive is written to the configured `output_path`, so set
+`NTVWEBCAMSCRAPER_OUTPUT_PATH` before running:
+
+    NTVWEBCAMSCRAPER_OUTPUT_PATH=/tmp/archive \\
+        python -m benchmarks.archive --cameras 3 --days 30 --frames-per-day 288
+
+The `partitioned` layout matches what `scrape` produces, including rows in the
+`images` table. The `flat` layout is the pre-partitioning layout consumed by
+`migrate` and has no database rows.
+"""
+
+import argparse
+from collections.abc import Iterator
+from datetime import datetime, timedelta
+from functools import cache
+from pathlib import Path
+from typing import Literal
+from zoneinfo import ZoneInfo
+
+import ffmpeg
+
+NL_TZ = ZoneInfo("America/St_Johns")
+START_DATE = datetime(2026, 1, 1, tzinfo=NL_TZ)
+ROOT = Path(__file__).parent.parent
+
+type Layout = Literal["partitioned", "flat"]
+
+
+@cache
+def tiny_jpeg(width: int = 32, height: int = 24) -> bytes:
+    out, _ = (
+        ffmpeg.input(f"color=c=gray:s={width}x{height}", f="lavfi")
+        .output("pipe:", vframes=1, format="image2", vcodec="mjpeg")
+        .run(capture_stdout=True, capture_stderr=True)
+    )
+    return out
+
+
+def camera_slugs(cameras: int) -> list[str]:
+    return [f"camera-{i:02d}" for i in range(cameras)]
+
+
+def frame_timestamps(
+    *, days: int, frames_per_day: int, start: datetime = START_DATE
+) -> Iterator[datetime]:
+    interval = timedelta(days=1) / frames_per_day
+    for i in range(days * frames_per_day):
+        yield start + i * interval
+
+
+def upgrade_database() -> None:
+    import alembic.config
+
+    alembic.config.main(
+        argv=["-c", str(ROOT / "alembic.ini"), "--raiseerr", "upgrade", "head"]
+    )
+
+
+def generate_archive(
+    *,
+    cameras: int,
+    days: int,
+    frames_per_day: int,
+    layout: Layout = "partitioned",
+    start: datetime = START_DATE,
+) -> int:
+    """Write the archive and return the number of images created."""
+    from sqlalchemy import insert
+
+    from ntvwebcamscraper.config import config
+    from ntvwebcamscraper.database import session
+    from ntvwebcamscraper.models import Image
+
+    # Alembic creates the SQLite file but not its parent directory.
+    config.output_path.mkdir(parents=True, exist_ok=True)
+    if layout == "partitioned":
+        upgrade_database()
+
+    image = tiny_jpeg()
+    filename_format = config.output_file_name_format + "." + config.output_file_format
+    created = 0
+
+    for camera in camera_slugs(cameras):
+        rows = []
+        for timestamp in frame_timestamps(
+            days=days, frames_per_day=frames_per_day, start=start
+        ):
+            filename = timestamp.strftime(filename_format)
+            if layout == "flat":
+                relative_path = Path(camera) / filename
+            else:
+                relative_path = (
+                    Path(camera)
+                    / str(timestamp.year)
+                    / f"{timestamp.month:02d}"
+                    / f"{timestamp.day:02d}"
+                    / filename
+                )
+                rows.append(
+                    {
+                        "camera": camera,
+                        "captured_at": timestamp,
+                        "year": timestamp.year,
+                        "month": timestamp.month,
+                        "day": timestamp.day,
+                        "hour": timestamp.hour,
+                        "minute": timestamp.minute,
+                        "second": timestamp.second,
+                        "weekday": timestamp.weekday(),
+                        "path": relative_path.as_posix(),
+                    }
+                )
+
+            output_path = config.output_path / relative_path
+            output_path.parent.mkdir(parents=True, exist_ok=True)
+            output_path.write_bytes(image)
+            created += 1
+
+        if rows:
+            with session() as s:
+                s.execute(insert(Image), rows)
+                s.commit()
+
+    return created
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cameras", type=int, default=3)
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--frames-per-day", type=int, default=48)
+    parser.add_argument(
+        "--layout", choices=["partitioned", "flat"], default="partitioned"
+    )
+    args = parser.parse_args()
+
+    created = generate_archive(
+        cameras=args.cameras,
+        days=args.days,
+        frames_per_day=args.frames_per_day,
+        layout=args.layout,
+    )
+    print(f"Generated {created} images")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""Local HLS stream stub for capture benchmarks."""
+
+import threading
+from collections.abc import Iterator
+from contextlib import contextmanager
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import ffmpeg
+
+
+class _QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, format: str, *args) -> None:
+        pass
+
+
+def generate_hls(directory: Path, *, seconds: int = 4) -> Path:
+    directory.mkdir(parents=True, exist_ok=True)
+    playlist = directory / "index.m3u8"
+    (
+        ffmpeg.input(f"testsrc=size=1280x720:rate=25:duration={seconds}", f="lavfi")
+        .output(
+            str(playlist),
+            vcodec="libx264",
+            preset="ultrafast",
+            g=25,
+            f="hls",
+            hls_time=1,
+            hls_list_size=0,
+        )
+        .run(overwrite_output=True, capture_stdout=True, capture_stderr=True)
+    )
+    return playlist
+
+
+@contextmanager
+def hls_stub(directory: Path, *, seconds: int = 4) -> Iterator[str]:
+    """Generate a short HLS stream and serve it over HTTP, yielding its URL."""
+    playlist = generate_hls(directory, seconds=seconds)
+    server = ThreadingHTTPServer(
+        ("127.0.0.1", 0), partial(_QuietHandler, directory=str(directory))
+    )
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_port}/{playlist.name}"
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,85 @@
+"""Guard CLI startup cost using `python -X importtime`.
+
+Runs each entry point against a throwaway database that is already at head and
+fails if a heavy dependency is imported or the total import time exceeds the
+budget.
+
+    python -m benchmarks.startup --budget-ms 400
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+
+HEAVY_MODULES = {"alembic", "bs4", "ffmpeg", "httpx", "scheduler", "sqlalchemy"}
+
+COMMANDS = [
+    ["--help"],
+    ["scrape", "--help"],
+    ["run", "--help"],
+    ["serve", "--help"],
+    ["migrate", "--help"],
+    ["upgrade", "--help"],
+    ["timelapse", "--help"],
+    ["cache", "list"],
+]
+
+
+def _run(args: list[str], env: dict[str, str], *, importtime: bool) -> str:
+    python_args = ["-X", "importtime"] if importtime else []
+    result = subprocess.run(
+        [sys.executable, *python_args, "-m", "ntvwebcamscraper", *args],
+        cwd=ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return result.stderr
+
+
+def parse_importtime(stderr: str) -> tuple[float, set[str]]:
+    """Return total import time in ms and the top-level packages imported."""
+    total_us = 0
+    packages: set[str] = set()
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        _, cumulative, name = line.removeprefix("import time:").split("|")
+        if not name.startswith("  "):
+            total_us += int(cumulative)
+        packages.add(name.strip().split(".")[0])
+    return total_us / 1000, packages
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--budget-ms", type=float, default=None)
+    args = parser.parse_args()
+
+    failed = False
+    with tempfile.TemporaryDirectory() as output_path:
+        env = os.environ | {"NTVWEBCAMSCRAPER_OUTPUT_PATH": output_path}
+        _run(["upgrade"], env, importtime=False)
+
+        for command in COMMANDS:
+            total_ms, packages = parse_importtime(_run(command, env, importtime=True))
+            heavy = sorted(packages & HEAVY_MODULES)
+            over_budget = args.budget_ms is not None and total_ms > args.budget_ms
+
+            status = "FAIL" if heavy or over_budget else "ok"
+            failed |= status == "FAIL"
+            print(f"{status:4}  {total_ms:8.1f} ms  {' '.join(command)}")
+            if heavy:
+                print(f"      imported heavy modules: {', '.join(heavy)}")
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
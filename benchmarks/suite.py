@@ -0,0 +1,457 @@
+"""End-to-end benchmarks for capture, ingestion, query, render and serving.
+
+Runs fully offline against a synthetic archive and a local HLS stub. Each
+benchmark runs in its own subprocess so that peak RSS is attributable to it.
+
+    python -m benchmarks                      # run everything
+    python -m benchmarks --only query-daily   # run a subset
+    python -m benchmarks --save-baseline      # record results as the baseline
+
+Results are compared against the stored baseline and the run fails if
+throughput drops or p95 latency grows by more than the tolerance. No baseline
+is shipped, as numbers are only comparable on the machine that recorded them;
+a missing default baseline is reported and skipped, but a path passed with
+--baseline must exist.
+"""
+
+import argparse
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections.abc import Callable
+from datetime import timedelta
+from pathlib import Path
+from typing import Self
+
+from pydantic import BaseModel, TypeAdapter
+
+from .archive import (
+    ROOT,
+    START_DATE,
+    camera_slugs,
+    frame_timestamps,
+    generate_archive,
+    upgrade_database,
+)
+from .hls import hls_stub
+
+DEFAULT_BASELINE_PATH = Path(__file__).parent / "baseline.json"
+
+
+class Params(BaseModel):
+    cameras: int = 3
+    days: int = 30
+    frames_per_day: int = 48
+    iterations: int = 20
+
+
+class BenchmarkResult(BaseModel):
+    name: str
+    samples: int
+    items: int
+    throughput: float
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    peak_rss_mb: float
+    peak_child_rss_mb: float
+
+
+type Benchmark = Callable[[Path, Params], tuple[int, list[float]]]
+
+_baseline_adapter = TypeAdapter(dict[str, BenchmarkResult])
+
+
+def _percentile(samples: list[float], q: float) -> float:
+    ordered = sorted(samples)
+    return ordered[round(q * (len(ordered) - 1))]
+
+
+def _time_ms(fn: Callable[[], object]) -> float:
+    start = time.perf_counter()
+    fn()
+    return (time.perf_counter() - start) * 1000
+
+
+def bench_capture(workdir: Path, params: Params) -> tuple[int, list[float]]:
+    from ntvwebcamscraper.webcams import save_stream_frame
+
+    with hls_stub(workdir / "hls") as url:
+        latencies = [
+            _time_ms(lambda i=i: save_stream_frame(url, workdir / f"frame-{i}.jpg"))
+            for i in range(params.iterations)
+        ]
+    return len(latencies), latencies
+
+
+def bench_ingest_add(workdir: Path, params: Params) -> tuple[int, list[float]]:
+    from ntvwebcamscraper.models import Image
+
+    upgrade_database()
+    timestamps = list(frame_timestamps(days=1, frames_per_day=params.frames_per_day))
+    latencies = [
+        _time_ms(
+            lambda camera=camera, ts=ts: Image.add(
+                camera, ts, Path(camera) / f"{ts:%Y-%m-%d %H-%M-%S}.jpg"
+            )
+        )
+        for camera in camera_slugs(params.cameras)
+        for ts in timestamps
+    ]
+    return len(latencies), latencies
+
+
+def bench_ingest_migrate(workdir: Path, params: Params) -> tuple[int, list[float]]:
+    from ntvwebcamscraper.cmd.migrate import migrate
+
+    upgrade_database()
+    items = 0
+    latencies = []
+    for i in range(3):
+        # Shift each round so migrated rows never collide with earlier ones.
+        items += generate_archive(
+            cameras=params.cameras,
+            days=params.days,
+            frames_per_day=params.frames_per_day,
+            layout="flat",
+            start=START_DATE + timedelta(days=i * params.days),
+        )
+        latencies.append(_time_ms(migrate))
+    return items, latencies
+
+
+def _bench_query(frame_selector_factory: Callable[[], object | None]) -> Benchmark:
+    def bench(workdir: Path, params: Params) -> tuple[int, list[float]]:
+        from ntvwebcamscraper.models import Image
+
+        frame_selector = frame_selector_factory()
+        items = 0
+        latencies = []
+        for _ in range(params.iterations):
+            for camera in camera_slugs(params.cameras):
+                start = time.perf_counter()
+                items += len(Image.list_frames(camera, frame_selector=frame_selector))
+                latencies.append((time.perf_counter() - start) * 1000)
+        return items, latencies
+
+    return bench
+
+
+def _daily_frames():
+    from ntvwebcamscraper.timelapse import daily_frames
+
+    return daily_frames(hour=12)
+
+
+def _frame_skip():
+    from ntvwebcamscraper.timelapse import frame_skip
+
+    return frame_skip(skip=12)
+
+
+def bench_concat(workdir: Path, params: Params) -> tuple[int, list[float]]:
+    from ntvwebcamscraper.models import Image
+    from ntvwebcamscraper.timelapse import _build_concat_file
+
+    frames = Image.list_frames(camera_slugs(1)[0])
+    latencies = [
+        _time_ms(lambda: _build_concat_file(frames, 12))
+        for _ in range(params.iterations)
+    ]
+    return len(frames) * len(latencies), latencies
+
+
+def _bench_render(profile_names: list[str]) -> Benchmark:
+    def bench(workdir: Path, params: Params) -> tuple[int, list[float]]:
+        from ntvwebcamscraper.timelapse import (
+            create_timelapse,
+            daily_frames,
+            get_encoder_profiles,
+        )
+
+        profiles = get_encoder_profiles(profile_names)
+        latencies = [
+            _time_ms(
+                lambda: create_timelapse(
+                    camera=camera_slugs(1)[0],
+                    from_date=START_DATE,
+                    to_date=START_DATE + timedelta(days=params.days),
+                    output_path=workdir / "timelapses",
+                    framerate=12,
+                    include_timestamp=False,
+                    frame_selector=daily_frames(hour=12),
+                    profiles=profiles,
+                    use_cache=False,
+                )
+            )
+            for _ in range(3)
+        ]
+        return params.days * len(latencies), latencies
+
+    return bench
+
+
+def bench_serve_latest(workdir: Path, params: Params) -> tuple[int, list[float]]:
+    import threading
+
+    import httpx
+
+    from ntvwebcamscraper.frame_buffer import frame_buffer
+    from ntvwebcamscraper.server import create_server
+
+    from .archive import tiny_jpeg
+
+    camera = camera_slugs(1)[0]
+    frame_buffer.enabled = True
+    frame_buffer.publish(camera, START_DATE, tiny_jpeg())
+
+    server = create_server("127.0.0.1", 0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_port}/cameras/{camera}/latest"
+    try:
+        with httpx.Client() as client:
+            latencies = [
+                _time_ms(lambda: client.get(url).raise_for_status())
+                for _ in range(params.iterations * 50)
+            ]
+    finally:
+        server.shutdown()
+        server.server_close()
+    return len(latencies), latencies
+
+
+BENCHMARKS: dict[str, Benchmark] = {
+    "capture": bench_capture,
+    "ingest-add": bench_ingest_add,
+    "ingest-migrate": bench_ingest_migrate,
+    "query-all": _bench_query(lambda: None),
+    "query-daily": _bench_query(_daily_frames),
+    "query-skip": _bench_query(_frame_skip),
+    "concat": bench_concat,
+    "render": _bench_render(["archive"]),
+    "render-multi": _bench_render(["archive", "web", "preview-gif"]),
+    "serve-latest": bench_serve_latest,
+}
+
+# These read the shared partitioned archive instead of starting from scratch.
+ARCHIVE_BENCHMARKS = {
+    "query-all",
+    "query-daily",
+    "query-skip",
+    "concat",
+    "render",
+    "render-multi",
+}
+
+
+def _read_status(pid: int | str) -> dict[str, str]:
+    with open(f"/proc/{pid}/status") as f:
+        return dict(line.rstrip("\n").split(":\t", 1) for line in f if ":\t" in line)
+
+
+class ChildRssSampler:
+    """Track the peak RSS of this process's children, such as ffmpeg, on Linux.
+
+    RUSAGE_CHILDREN can't be used for this: a forked child starts out with the
+    parent's resident set, so its ru_maxrss is the worker's own peak. Instead
+    each child's VmHWM, which exec resets, is polled from /proc while it runs.
+    Children that start and exit between polls are missed, but those are too
+    short-lived to matter.
+    """
+
+    def __init__(self, interval: float = 0.005) -> None:
+        self.interval = interval
+        self.peak_kib = 0
+        self._name = _read_status("self")["Name"]
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def __enter__(self) -> Self:
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            for children in Path("/proc/self/task").glob("*/children"):
+                for pid in children.read_text().split():
+                    try:
+                        status = _read_status(pid)
+                    except FileNotFoundError:
+                        continue
+                    # Until exec, a child still reports our own memory.
+                    if status["Name"] == self._name or "VmHWM" not in status:
+                        continue
+                    hwm_kib = int(status["VmHWM"].split()[0])
+                    self.peak_kib = max(self.peak_kib, hwm_kib)
+
+
+def run_worker(name: str, workdir: Path, params: Params) -> BenchmarkResult:
+    with ChildRssSampler() as children:
+        items, latencies = BENCHMARKS[name](workdir, params)
+    # ru_maxrss is reported in KiB on Linux.
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    peak_child_rss = children.peak_kib / 1024
+    return BenchmarkResult(
+        name=name,
+        samples=len(latencies),
+        items=items,
+        throughput=items / (sum(latencies) / 1000),
+        p50_ms=_percentile(latencies, 0.50),
+        p95_ms=_percentile(latencies, 0.95),
+        p99_ms=_percentile(latencies, 0.99),
+        peak_rss_mb=peak_rss,
+        peak_child_rss_mb=peak_child_rss,
+    )
+
+
+def _run_subprocess(args: list[str], output_path: Path) -> str:
+    output_path.mkdir(parents=True, exist_ok=True)
+    env = os.environ | {
+        "NTVWEBCAMSCRAPER_OUTPUT_PATH": str(output_path),
+        "NTVWEBCAMSCRAPER_TIMELAPSE_CACHE_PATH": str(output_path / "cache"),
+    }
+    result = subprocess.run(
+        [sys.executable, *args],
+        cwd=ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"{' '.join(args)} failed:\n{result.stderr}")
+    return result.stdout
+
+
+def compare(
+    results: list[BenchmarkResult],
+    baseline: dict[str, BenchmarkResult],
+    tolerance: float,
+) -> list[str]:
+    """Return a description of every metric that regressed beyond the tolerance."""
+    regressions = []
+    for result in results:
+        previous = baseline.get(result.name)
+        if previous is None:
+            continue
+        if result.throughput < previous.throughput * (1 - tolerance):
+            regressions.append(
+                f"{result.name}: throughput {result.throughput:.1f}/s "
+                f"< baseline {previous.throughput:.1f}/s"
+            )
+        if result.p95_ms > previous.p95_ms * (1 + tolerance):
+            regressions.append(
+                f"{result.name}: p95 {result.p95_ms:.2f} ms "
+                f"> baseline {previous.p95_ms:.2f} ms"
+            )
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--only", nargs="+", choices=sorted(BENCHMARKS))
+    parser.add_argument("--cameras", type=int, default=Params().cameras)
+    parser.add_argument("--days", type=int, default=Params().days)
+    parser.add_argument("--frames-per-day", type=int, default=Params().frames_per_day)
+    parser.add_argument("--iterations", type=int, default=Params().iterations)
+    parser.add_argument(
+        "--baseline",
+        type=Path,
+        help=f"baseline to compare against (default: {DEFAULT_BASELINE_PATH})",
+    )
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    parser.add_argument("--workdir", type=Path, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    params = Params(
+        cameras=args.cameras,
+        days=args.days,
+        frames_per_day=args.frames_per_day,
+        iterations=args.iterations,
+    )
+
+    if args.worker is not None:
+        result = run_worker(args.worker, args.workdir, params)
+        print(result.model_dump_json())
+        return 0
+
+    baseline_path = args.baseline or DEFAULT_BASELINE_PATH
+    if (
+        args.baseline is not None
+        and not args.save_baseline
+        and not baseline_path.exists()
+    ):
+        # Don't let a mistyped path turn a regression check into a silent pass.
+        parser.error(f"baseline {baseline_path} does not exist")
+
+    names = args.only or list(BENCHMARKS)
+    params_args = [
+        f"--cameras={params.cameras}",
+        f"--days={params.days}",
+        f"--frames-per-day={params.frames_per_day}",
+        f"--iterations={params.iterations}",
+    ]
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        workdir = Path(tmp)
+        archive_path = workdir / "archive"
+        if ARCHIVE_BENCHMARKS.intersection(names):
+            print(f"Generating archive in {archive_path}...", file=sys.stderr)
+            _run_subprocess(
+                ["-m", "benchmarks.archive", *params_args[:3]], archive_path
+            )
+
+        print(
+            f"{'benchmark':16} {'items/s':>12} {'p50 ms':>9} {'p95 ms':>9} "
+            f"{'p99 ms':>9} {'rss MB':>8} {'child MB':>9}"
+        )
+        for name in names:
+            output_path = archive_path if name in ARCHIVE_BENCHMARKS else workdir / name
+            stdout = _run_subprocess(
+                [
+                    "-m",
+                    "benchmarks",
+                    f"--worker={name}",
+                    f"--workdir={output_path}",
+                    *params_args,
+                ],
+                output_path,
+            )
+            result = BenchmarkResult.model_validate_json(stdout.splitlines()[-1])
+            results.append(result)
+            print(
+                f"{result.name:16} {result.throughput:12.1f} {result.p50_ms:9.2f} "
+                f"{result.p95_ms:9.2f} {result.p99_ms:9.2f} "
+                f"{result.peak_rss_mb:8.1f} {result.peak_child_rss_mb:9.1f}"
+            )
+
+    baseline = (
+        _baseline_adapter.validate_json(baseline_path.read_bytes())
+        if baseline_path.exists()
+        else {}
+    )
+
+    if args.save_baseline:
+        baseline |= {result.name: result for result in results}
+        baseline_path.write_bytes(_baseline_adapter.dump_json(baseline, indent=2))
+        print(f"Saved baseline to {baseline_path}")
+        return 0
+
+    if not baseline:
+        print("No baseline found; run with --save-baseline to record one.")
+        return 0
+
+    regressions = compare(results, baseline, args.tolerance)
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    return 1 if regressions else 0
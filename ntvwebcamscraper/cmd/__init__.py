@@ -1,52 +1,110 @@
 import time
+from collections.abc import Callable
+from typing import Annotated
 
-import alembic.config
 import typer
-from scheduler import Scheduler
 
 from ntvwebcamscraper.config import config
-from ntvwebcamscraper.database import merge_pending_migration
-from ntvwebcamscraper.webcams import save_all_camera_images
 
-from .migrate import migrate as _migrate
+from .cache import app as cache_app
 from .timelapse import app as timelapse_app
 
 app = typer.Typer()
 app.add_typer(timelapse_app, name="timelapse")
+app.add_typer(
+    cache_app, name="cache", help="Inspect and prune the timelapse render cache."
+)
+
+# Heavy dependencies (httpx, BeautifulSoup, ffmpeg-python, SQLAlchemy, Alembic)
+# are imported inside each command so that invocations only pay for what they use.
 
 
 @app.callback()
 def on_startup() -> None:
-    if config.init_on_startup:
+    from ntvwebcamscraper.schema import needs_upgrade
+
+    if config.init_on_startup and needs_upgrade():
         upgrade()
 
 
 @app.command()
 def migrate():
     """Migrate images from flat directory structure to date-partitioned structure."""
+    from .migrate import migrate as _migrate
+
     _migrate()
 
 
 @app.command()
 def scrape():
     """Scrape the webcam images once."""
+    from ntvwebcamscraper.webcams import save_all_camera_images
+
     save_all_camera_images()
 
 
-@app.command()
-def run():
-    """Begin scraping the webcam images at the specified interval."""
+def _run_forever(job: Callable[[], None]) -> None:
+    from scheduler import Scheduler
+
     schedule = Scheduler()
-    schedule.cyclic(config.interval, save_all_camera_images)
+    schedule.cyclic(config.interval, job)
 
     while True:
         schedule.exec_jobs()
         time.sleep(1)
 
 
+def _scrape_forever() -> None:
+    from ntvwebcamscraper.webcams import save_all_camera_images
+
+    _run_forever(save_all_camera_images)
+
+
+@app.command()
+def run():
+    """Begin scraping the webcam images at the specified interval."""
+    _scrape_forever()
+
+
+@app.command()
+def serve(
+    host: Annotated[str | None, typer.Option()] = None,
+    port: Annotated[int | None, typer.Option()] = None,
+    scrape: Annotated[
+        bool,
+        typer.Option(
+            help="Also scrape at the configured interval. Without scraping, "
+            "new frames are picked up from the database at that interval."
+        ),
+    ] = True,
+):
+    """Serve the latest frames, frames by timestamp and short timelapse clips."""
+    import threading
+
+    from ntvwebcamscraper.server import (
+        create_server,
+        refresh_frame_buffer,
+        warm_frame_buffer,
+    )
+
+    warm_frame_buffer(live=scrape)
+    server = create_server(host or config.serve_host, port or config.serve_port)
+    print("Serving on http://{}:{}".format(*server.server_address[:2]))
+
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    if scrape:
+        _scrape_forever()
+    else:
+        _run_forever(refresh_frame_buffer)
+
+
 @app.command()
 def upgrade() -> None:
     """Perform database migrations."""
+    import alembic.config
+
+    from ntvwebcamscraper.database import merge_pending_migration
+
     alembic.config.main(argv=["--raiseerr", "upgrade", "head"])
 
     merge_pending_migration()
@@ -0,0 +1,62 @@
+from datetime import timedelta
+from typing import Annotated
+
+import typer
+from pydantic import ByteSize, TypeAdapter
+
+from ntvwebcamscraper import render_cache
+from ntvwebcamscraper.config import config
+
+app = typer.Typer()
+
+_byte_size = TypeAdapter(ByteSize)
+
+
+@app.command(name="list")
+def list_entries():
+    """List cached timelapse renders, most recently used first."""
+
+    entries = render_cache.list_entries()
+    for entry in entries:
+        print(
+            f"{entry.key[:16]}  {ByteSize(entry.size).human_readable():>10}  "
+            f"{entry.last_used:%Y-%m-%d %H:%M:%S}"
+        )
+
+    total = ByteSize(sum(e.size for e in entries))
+    print(
+        f"{len(entries)} entries, {total.human_readable()} of "
+        f"{config.timelapse_cache_max_size.human_readable()}"
+    )
+
+
+@app.command()
+def prune(
+    max_size: Annotated[
+        str | None,
+        typer.Option(help="e.g. 500MiB; defaults to the configured limit"),
+    ] = None,
+    max_age_days: Annotated[float | None, typer.Option()] = None,
+    clear: Annotated[bool, typer.Option(help="Remove every cached render")] = False,
+):
+    """Evict least recently used renders until the cache fits within the limits."""
+
+    if clear:
+        size_limit = 0
+    elif max_size is not None:
+        size_limit = _byte_size.validate_python(max_size)
+    else:
+        size_limit = config.timelapse_cache_max_size
+
+    max_age = (
+        timedelta(days=max_age_days).total_seconds()
+        if max_age_days is not None
+        else None
+    )
+
+    evicted = render_cache.prune(max_size=size_limit, max_age=max_age)
+    freed = ByteSize(sum(e.size for e in evicted))
+    print(f"Evicted {len(evicted)} entries, freed {freed.human_readable()}")
+
+
+__all__ = ["app"]
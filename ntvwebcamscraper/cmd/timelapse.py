@@ -1,18 +1,15 @@
 from datetime import datetime
 from pathlib import Path
-from typing import Annotated, cast
+from typing import TYPE_CHECKING, Annotated, cast
 from zoneinfo import ZoneInfo
 
 import typer
 from pydantic import BaseModel
 
-from ntvwebcamscraper.timelapse import (
-    FrameSelector,
-    all_frames,
-    create_timelapse,
-    daily_frames,
-)
-from ntvwebcamscraper.webcams import list_cameras
+from ntvwebcamscraper.config import config
+
+if TYPE_CHECKING:
+    from ntvwebcamscraper.timelapse import FrameSelector
 
 app = typer.Typer()
 
@@ -23,8 +20,14 @@ def create_timelapses(
     to_date: datetime,
     framerate: int,
     include_timestamp: bool,
-    frame_selector: FrameSelector,
+    use_cache: bool,
+    profiles: list[str] | None,
+    frame_selector: "FrameSelector",
 ):
+    from ntvwebcamscraper.timelapse import create_timelapse, get_encoder_profiles
+
+    encoder_profiles = get_encoder_profiles(profiles)
+
     from_date = from_date.replace(tzinfo=ZoneInfo("America/St_Johns"))
     to_date = to_date.replace(tzinfo=ZoneInfo("America/St_Johns"))
 
@@ -36,10 +39,14 @@ def create_timelapses(
             output_path=Path("timelapses"),
             framerate=framerate,
             include_timestamp=include_timestamp,
+            use_cache=use_cache,
+            profiles=encoder_profiles,
             frame_selector=frame_selector,
         )
         return
 
+    from ntvwebcamscraper.webcams import list_cameras
+
     for camera in list_cameras():
         create_timelapse(
             camera=camera.slug,
@@ -48,16 +55,48 @@ def create_timelapses(
             output_path=Path("timelapses"),
             framerate=framerate,
             include_timestamp=include_timestamp,
+            use_cache=use_cache,
+            profiles=encoder_profiles,
             frame_selector=frame_selector,
         )
 
 
+def _validate_profiles(profiles: list[str] | None) -> None:
+    if profiles is None:
+        return
+
+    unknown = [name for name in profiles if name not in config.encoder_profiles]
+    if unknown:
+        raise typer.BadParameter(
+            f"Unknown encoder profile {unknown[0]!r}; choose from "
+            + ", ".join(config.encoder_profiles),
+            param_hint="--profile",
+        )
+
+    outputs: dict[str, str] = {}
+    for name in profiles:
+        encoder_profile = config.encoder_profiles[name]
+        output = f"<camera>{encoder_profile.suffix}.{encoder_profile.extension}"
+        if outputs.get(output) == name:
+            raise typer.BadParameter(
+                f"{name!r} is given more than once", param_hint="--profile"
+            )
+        if output in outputs:
+            raise typer.BadParameter(
+                f"{outputs[output]!r} and {name!r} would both write {output}",
+                param_hint="--profile",
+            )
+        outputs[output] = name
+
+
 class TimelapseOptions(BaseModel):
     camera: str
     from_date: datetime
     to_date: datetime
     framerate: int
     include_timestamp: bool
+    use_cache: bool
+    profiles: list[str] | None
 
 
 @app.callback()
@@ -68,13 +107,25 @@ def timelapse_callback(
     to_date: Annotated[datetime, typer.Option()],
     framerate: Annotated[int, typer.Option()] = 12,
     include_timestamp: Annotated[bool, typer.Option()] = False,
+    use_cache: Annotated[bool, typer.Option()] = True,
+    profile: Annotated[
+        list[str] | None,
+        typer.Option(
+            help="Encoder profile to render; repeat to produce several outputs "
+            "in one pass. Defaults to the configured timelapse_profiles."
+        ),
+    ] = None,
 ):
+    _validate_profiles(profile)
+
     ctx.obj = TimelapseOptions(
         camera=camera,
         from_date=from_date,
         to_date=to_date,
         framerate=framerate,
         include_timestamp=include_timestamp,
+        use_cache=use_cache,
+        profiles=profile,
     )
 
 
@@ -85,6 +136,7 @@ def daily(
     frames: int = 1,
 ):
     """Create a timelapse from a specified number of frames from a given hour each day."""
+    from ntvwebcamscraper.timelapse import daily_frames
 
     options = cast(TimelapseOptions, ctx.obj)
 
@@ -99,6 +151,7 @@ def all(
     ctx: typer.Context,
 ):
     """Create a timelapse from all saved images."""
+    from ntvwebcamscraper.timelapse import all_frames
 
     options = cast(TimelapseOptions, ctx.obj)
 
@@ -1,10 +1,62 @@
 from datetime import timedelta
 from pathlib import Path
-from typing import Optional
+from typing import Any, Optional
 
+from pydantic import BaseModel, ByteSize, field_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
+class EncoderProfile(BaseModel):
+    codec: str = "libx264"
+    extension: str = "mp4"
+    # Appended to the camera slug to form the output filename.
+    suffix: str = ""
+    preset: Optional[str] = None
+    crf: Optional[int] = None
+    threads: Optional[int] = None
+    # Maximum output height in pixels; width follows the aspect ratio.
+    height: Optional[int] = None
+    fps: Optional[int] = None
+    pix_fmt: Optional[str] = None
+    extra_options: dict[str, str | int] = {}
+
+    def output_options(self) -> dict[str, str | int]:
+        options: dict[str, str | int] = {"vcodec": self.codec}
+        for key in ("preset", "crf", "threads", "pix_fmt"):
+            value = getattr(self, key)
+            if value is not None:
+                options[key] = value
+        return options | self.extra_options
+
+
+DEFAULT_ENCODER_PROFILES = {
+    "archive": EncoderProfile(),
+    "web": EncoderProfile(
+        suffix="-720p",
+        preset="veryfast",
+        crf=23,
+        height=720,
+        pix_fmt="yuv420p",
+        extra_options={"movflags": "+faststart"},
+    ),
+    "preview-gif": EncoderProfile(
+        codec="gif",
+        extension="gif",
+        suffix="-preview",
+        height=240,
+        fps=10,
+    ),
+    "preview-webm": EncoderProfile(
+        codec="libvpx-vp9",
+        extension="webm",
+        suffix="-preview",
+        crf=40,
+        height=360,
+        extra_options={"b:v": 0},
+    ),
+}
+
+
 class Config(BaseSettings):
     model_config = SettingsConfigDict(env_prefix="ntvwebcamscraper_")
 
@@ -14,15 +66,53 @@ class Config(BaseSettings):
     interval: timedelta = timedelta(minutes=5)
     db_filename: str = "images.db"
     init_on_startup: bool = True
+    timelapse_cache_path: Path = Path("timelapses") / ".cache"
+    timelapse_cache_max_size: ByteSize = ByteSize(2 * 1024**3)
+    encoder_profiles: dict[str, EncoderProfile] = DEFAULT_ENCODER_PROFILES
+    timelapse_profiles: list[str] = ["archive"]
+    serve_host: str = "127.0.0.1"
+    serve_port: int = 8000
+    frame_buffer_size: int = 12
+    serve_max_clip_frames: int = 500
+    serve_clip_profile: str = "web"
 
     target_cameras: Optional[list[str]] = None
     excluded_cameras: list[str] = []
 
+    @field_validator("encoder_profiles", mode="before")
+    @classmethod
+    def merge_encoder_profiles(cls, value: Any) -> Any:
+        """Apply configured profiles field by field over the built-in ones."""
+        if not isinstance(value, dict):
+            return value
+
+        profiles = {
+            name: profile.model_dump()
+            for name, profile in DEFAULT_ENCODER_PROFILES.items()
+        }
+        for name, overrides in value.items():
+            if isinstance(overrides, EncoderProfile):
+                overrides = overrides.model_dump(exclude_unset=True)
+            if not isinstance(overrides, dict):
+                # Leave it for field validation to reject.
+                profiles[name] = overrides
+                continue
+            profiles[name] = profiles.get(name, {}) | overrides
+        return profiles
+
     @property
     def db_uri(self) -> str:
-        return f"sqlite:///{self.output_path / self.db_filename}"
+        return f"sqlite:///{self.db_path}"
+
+    @property
+    def db_path(self) -> Path:
+        return self.output_path / self.db_filename
+
+    @property
+    def migration_db_path(self) -> Path:
+        return self.output_path / "migration.db"
 
 
 config = Config()
 
-__all__ = ["config"]
+__all__ = ["EncoderProfile", "config"]
@@ -1,5 +1,7 @@
-from sqlalchemy import create_engine, text
-from sqlalchemy.orm import DeclarativeBase, sessionmaker
+from functools import cache
+
+from sqlalchemy import Engine, create_engine, text
+from sqlalchemy.orm import DeclarativeBase, Session, sessionmaker
 
 from .config import config
 
@@ -8,17 +10,25 @@ class Base(DeclarativeBase):
     pass
 
 
-engine = create_engine(config.db_uri)
-session = sessionmaker(engine, expire_on_commit=False)
+@cache
+def get_engine() -> Engine:
+    return create_engine(config.db_uri)
+
+
+_session_factory = sessionmaker(expire_on_commit=False)
+
+
+def session() -> Session:
+    return _session_factory(bind=get_engine())
 
 
 def merge_pending_migration() -> None:
-    migration_db_path = config.output_path / "migration.db"
+    migration_db_path = config.migration_db_path
     if not migration_db_path.exists():
         return
 
     print("Found migration.db, merging...")
-    with engine.connect() as conn:
+    with get_engine().connect() as conn:
         conn.execute(
             text("ATTACH DATABASE :path AS source"), {"path": str(migration_db_path)}
         )
@@ -0,0 +1,115 @@
+"""In-memory ring buffer of the most recent frames per camera."""
+
+import bisect
+import threading
+import zlib
+from collections import deque
+from datetime import datetime
+
+from pydantic import BaseModel, ConfigDict
+
+from .config import config
+
+
+def frame_etag(camera: str, captured_at: datetime) -> str:
+    # Use the UTC epoch so frames an hour apart across a DST fall-back, which
+    # share the same local wall time, get distinct tags. This relies on
+    # `captured_at` carrying the right offset; timestamps read back from the
+    # database have lost it, see `stored_frame_etag`.
+    return f'"{camera}-{int(captured_at.timestamp())}"'
+
+
+def stored_frame_etag(camera: str, captured_at: datetime, data: bytes) -> str:
+    """Return the ETag for a frame whose timestamp was read from the database.
+
+    Stored timestamps have no offset, so one inside the DST fall-back hour may
+    be either of two instants; such frames are tagged by their content instead.
+    """
+    if captured_at.replace(fold=1).utcoffset() == captured_at.utcoffset():
+        return frame_etag(camera, captured_at)
+    return f'"{camera}-{zlib.crc32(data):08x}"'
+
+
+class Frame(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
+    camera: str
+    captured_at: datetime
+    data: bytes
+    etag: str
+
+
+class FrameBuffer:
+    """Thread-safe ring buffer of frames, filled by the capture path.
+
+    Publishing is a no-op until the buffer is enabled, so scrape-only runs don't
+    pay for holding frames in memory. `live` marks that capture runs in this
+    process, so the newest buffered frame is also the newest frame stored.
+    """
+
+    def __init__(self, size: int) -> None:
+        self.size = size
+        self.enabled = False
+        self.live = False
+        self._frames: dict[str, deque[Frame]] = {}
+        self._lock = threading.Lock()
+
+    def publish(
+        self,
+        camera: str,
+        captured_at: datetime,
+        data: bytes,
+        etag: str | None = None,
+    ) -> None:
+        if not self.enabled:
+            return
+
+        frame = Frame(
+            camera=camera,
+            captured_at=captured_at,
+            data=data,
+            etag=etag or frame_etag(camera, captured_at),
+        )
+        with self._lock:
+            frames = self._frames.setdefault(camera, deque(maxlen=self.size))
+            if frames and frames[-1].captured_at >= captured_at:
+                # Keep the buffer ordered; out-of-order frames are only ever
+                # older than what we already hold.
+                return
+            frames.append(frame)
+
+    def cameras(self) -> dict[str, Frame]:
+        with self._lock:
+            return {camera: frames[-1] for camera, frames in self._frames.items()}
+
+    def latest(self, camera: str) -> Frame | None:
+        with self._lock:
+            frames = self._frames.get(camera)
+            return frames[-1] if frames else None
+
+    def at(self, camera: str, timestamp: datetime) -> Frame | None:
+        """Return the newest frame at or before `timestamp`.
+
+        Returns None when the answer may only be found in the database: when
+        `timestamp` is older than the buffered window, or newer than it while
+        the buffer isn't live.
+        """
+        with self._lock:
+            frames = list(self._frames.get(camera, ()))
+        if not frames or timestamp < frames[0].captured_at:
+            return None
+        if not self.live and timestamp > frames[-1].captured_at:
+            return None
+        index = bisect.bisect_right(frames, timestamp, key=lambda f: f.captured_at)
+        return frames[index - 1]
+
+
+frame_buffer = FrameBuffer(config.frame_buffer_size)
+
+__all__ = [
+    "Frame",
+    "FrameBuffer",
+    "frame_buffer",
+    "frame_etag",
+    "stored_frame_etag",
+]
@@ -72,3 +72,19 @@ class Image(Base):
         with session() as s:
             rows = s.execute(q).all()
         return [(ts, (config.output_path / path).absolute()) for ts, path in rows]
+
+    @classmethod
+    def latest_frames(
+        cls,
+        camera: str,
+        limit: int,
+        latest_ts: datetime | None = None,
+    ) -> list[tuple[datetime, Path]]:
+        """Return up to `limit` frames at or before `latest_ts`, newest first."""
+        return cls.list_frames(
+            camera,
+            latest_ts=latest_ts,
+            frame_selector=lambda q: (
+                q.order_by(None).order_by(cls.captured_at.desc()).limit(limit)
+            ),
+        )
@@ -0,0 +1,166 @@
+"""Content-addressed cache of rendered timelapses."""
+
+import hashlib
+import json
+import os
+import shutil
+import time
+import uuid
+from collections.abc import Iterator
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+from pydantic import BaseModel
+
+from .config import config
+
+# Bump when a change to rendering would produce different output for the same key.
+CACHE_FORMAT_VERSION = 1
+
+# Renders write continuously, so a temp file untouched for this long (in seconds)
+# was left behind by a killed render.
+STALE_TEMP_AGE = 60 * 60
+
+
+class CacheEntry(BaseModel):
+    key: str
+    path: Path
+    size: int
+    last_used: datetime
+
+
+def render_key(
+    frames: list[tuple[datetime, Path]],
+    *,
+    framerate: int,
+    include_timestamp: bool,
+    encoder_options: dict[str, Any],
+) -> str:
+    digest = hashlib.sha256()
+    digest.update(
+        json.dumps(
+            {
+                "version": CACHE_FORMAT_VERSION,
+                "framerate": framerate,
+                "include_timestamp": include_timestamp,
+                "encoder_options": encoder_options,
+            },
+            sort_keys=True,
+            default=str,
+        ).encode()
+    )
+    for ts, image_path in frames:
+        digest.update(f"\n{ts.isoformat()}\t{image_path.as_posix()}".encode())
+    return digest.hexdigest()
+
+
+def entry_path(key: str, suffix: str = ".mp4") -> Path:
+    return config.timelapse_cache_path / f"{key}{suffix}"
+
+
+def lookup(key: str, suffix: str = ".mp4") -> Path | None:
+    path = entry_path(key, suffix)
+    try:
+        os.utime(path)
+    except FileNotFoundError:
+        return None
+    return path
+
+
+@contextmanager
+def store(key: str, suffix: str = ".mp4") -> Iterator[Path]:
+    """Yield a temporary path to render into, then atomically add it to the cache."""
+    path = entry_path(key, suffix)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # Unique per writer, so concurrent renders of the same key (e.g. a cron
+    # timelapse and the serve clip endpoint) can't clobber each other. The file
+    # is left for ffmpeg to create so it gets the usual umask-derived mode.
+    tmp_path = path.with_name(f".{key}.{os.getpid()}.{uuid.uuid4().hex}{suffix}")
+    try:
+        yield tmp_path
+        tmp_path.replace(path)
+    finally:
+        tmp_path.unlink(missing_ok=True)
+
+
+def link_into(cached_path: Path, destination: Path) -> None:
+    destination.parent.mkdir(parents=True, exist_ok=True)
+    destination.unlink(missing_ok=True)
+    try:
+        os.link(cached_path, destination)
+    except OSError:
+        shutil.copy2(cached_path, destination)
+
+
+def list_entries() -> list[CacheEntry]:
+    if not config.timelapse_cache_path.exists():
+        return []
+
+    entries = []
+    with os.scandir(config.timelapse_cache_path) as it:
+        for entry in it:
+            if entry.name.startswith(".") or not entry.is_file(follow_symlinks=False):
+                continue
+            stat = entry.stat(follow_symlinks=False)
+            entries.append(
+                CacheEntry(
+                    key=entry.name.split(".", 1)[0],
+                    path=Path(entry.path),
+                    size=stat.st_size,
+                    last_used=datetime.fromtimestamp(stat.st_mtime),
+                )
+            )
+    return sorted(entries, key=lambda e: e.last_used, reverse=True)
+
+
+def _remove_stale_temp_files() -> None:
+    if not config.timelapse_cache_path.exists():
+        return
+
+    cutoff = time.time() - STALE_TEMP_AGE
+    for path in config.timelapse_cache_path.glob(".*"):
+        try:
+            # A writer may finish or clean up its temp file while we look.
+            if path.is_file() and path.stat().st_mtime < cutoff:
+                path.unlink(missing_ok=True)
+        except FileNotFoundError:
+            continue
+
+
+def prune(
+    *, max_size: int | None = None, max_age: float | None = None
+) -> list[CacheEntry]:
+    """Evict least recently used entries until the cache fits within the limits.
+
+    `max_size` is in bytes and `max_age` in seconds. Returns the evicted entries.
+    Temp files abandoned by killed renders are removed as well.
+    """
+    _remove_stale_temp_files()
+
+    entries = list_entries()
+    now = time.time()
+    total = sum(e.size for e in entries)
+    evicted = []
+    for entry in reversed(entries):
+        too_old = max_age is not None and now - entry.last_used.timestamp() > max_age
+        too_big = max_size is not None and total > max_size
+        if not (too_old or too_big):
+            continue
+        entry.path.unlink(missing_ok=True)
+        total -= entry.size
+        evicted.append(entry)
+    return evicted
+
+
+__all__ = [
+    "CacheEntry",
+    "entry_path",
+    "link_into",
+    "list_entries",
+    "lookup",
+    "prune",
+    "render_key",
+    "store",
+]
@@ -0,0 +1,72 @@
+"""Cheap schema-version checks that avoid importing SQLAlchemy or Alembic."""
+
+import ast
+import sqlite3
+from contextlib import closing
+from functools import cache
+from pathlib import Path
+
+from .config import config
+
+VERSIONS_PATH = Path(__file__).parent / "migrations" / "versions"
+
+
+def _read_revision_ids(script: Path) -> tuple[str, set[str]] | None:
+    """Return a script's revision and parents, or None if it isn't a migration."""
+    revision: str | None = None
+    down_revisions: set[str] = set()
+
+    for node in ast.parse(script.read_text(encoding="utf-8")).body:
+        if not isinstance(node, ast.AnnAssign | ast.Assign) or node.value is None:
+            continue
+        targets = [node.target] if isinstance(node, ast.AnnAssign) else node.targets
+        names = {t.id for t in targets if isinstance(t, ast.Name)}
+        # Only the identifiers are literals; other module-level assignments
+        # (e.g. `images = sa.table(...)` in data migrations) may not be.
+        if "revision" in names:
+            revision = ast.literal_eval(node.value)
+        elif "down_revision" in names:
+            value = ast.literal_eval(node.value)
+            if value is not None:
+                down_revisions.update([value] if isinstance(value, str) else value)
+
+    if revision is None:
+        return None
+
+    return revision, down_revisions
+
+
+@cache
+def head_revisions() -> frozenset[str]:
+    revisions: set[str] = set()
+    down_revisions: set[str] = set()
+    for script in VERSIONS_PATH.glob("*.py"):
+        ids = _read_revision_ids(script)
+        if ids is None:
+            continue
+        revision, parents = ids
+        revisions.add(revision)
+        down_revisions.update(parents)
+    return frozenset(revisions - down_revisions)
+
+
+def current_revisions() -> frozenset[str]:
+    if not config.db_path.exists():
+        return frozenset()
+
+    db_uri = f"{config.db_path.absolute().as_uri()}?mode=ro"
+    try:
+        with closing(sqlite3.connect(db_uri, uri=True)) as conn:
+            rows = conn.execute("SELECT version_num FROM alembic_version").fetchall()
+    except sqlite3.OperationalError:
+        return frozenset()
+
+    return frozenset(row[0] for row in rows)
+
+
+def needs_upgrade() -> bool:
+    """Return whether `upgrade` has any work to do."""
+    return config.migration_db_path.exists() or current_revisions() != head_revisions()
+
+
+__all__ = ["current_revisions", "head_revisions", "needs_upgrade"]
@@ -0,0 +1,289 @@
+"""HTTP API serving the latest frames, frames by timestamp and short clips.
+
+Latest-frame requests are answered from the in-memory frame buffer and never
+touch disk or SQLite. The buffer is fed by in-process capture, or refreshed
+from the database when another process does the scraping.
+
+    GET /cameras                              latest capture time per camera
+    GET /cameras/<camera>/latest              newest frame
+    GET /cameras/<camera>/frames/<timestamp>  newest frame at or before timestamp
+    GET /cameras/<camera>/clip                timelapse clip; accepts from, to,
+                                              framerate, profile and
+                                              include_timestamp query parameters
+"""
+
+import json
+import mimetypes
+import os
+import shutil
+import threading
+from datetime import datetime, timedelta
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlsplit
+from zoneinfo import ZoneInfo
+
+from .config import config
+from .frame_buffer import frame_buffer, stored_frame_etag
+from .models import Image
+from .timelapse import cache_key, get_encoder_profiles, render_cached
+from .webcams import list_cameras
+
+NL_TZ = ZoneInfo("America/St_Johns")
+DEFAULT_CLIP_DURATION = timedelta(hours=24)
+
+
+def _localize(timestamp: datetime) -> datetime:
+    if timestamp.tzinfo is None:
+        return timestamp.replace(tzinfo=NL_TZ)
+    return timestamp.astimezone(NL_TZ)
+
+
+def _parse_timestamp(value: str) -> datetime:
+    try:
+        return _localize(datetime.fromisoformat(value))
+    except ValueError as e:
+        raise ValueError(f"Invalid timestamp: {value}") from e
+
+
+def _etag_matches(header: str | None, etag: str) -> bool:
+    if header is None:
+        return False
+    candidates = {tag.strip().removeprefix("W/") for tag in header.split(",")}
+    return "*" in candidates or etag in candidates
+
+
+def refresh_frame_buffer() -> None:
+    """Publish frames stored since the newest buffered frame of each camera."""
+    for camera in list_cameras():
+        newest = frame_buffer.latest(camera.slug)
+        for timestamp, path in reversed(
+            Image.latest_frames(camera.slug, frame_buffer.size)
+        ):
+            timestamp = _localize(timestamp)
+            if newest is not None and timestamp <= newest.captured_at:
+                continue
+            try:
+                data = path.read_bytes()
+            except FileNotFoundError:
+                continue
+            frame_buffer.publish(
+                camera.slug,
+                timestamp,
+                data,
+                stored_frame_etag(camera.slug, timestamp, data),
+            )
+
+
+def warm_frame_buffer(*, live: bool) -> None:
+    """Enable the frame buffer and seed it with the most recent frames on disk.
+
+    `live` should be set when capture runs in this process and publishes to the
+    buffer; otherwise `refresh_frame_buffer` must be called to pick up frames
+    stored by another process.
+    """
+    frame_buffer.enabled = True
+    frame_buffer.live = live
+    refresh_frame_buffer()
+
+
+class FrameServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address: tuple[str, int]) -> None:
+        super().__init__(address, FrameRequestHandler)
+        # Renders are CPU-heavy and share cache temp files; run one at a time.
+        self.render_lock = threading.Lock()
+
+
+class FrameRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body are written separately; with keep-alive, Nagle's
+    # algorithm would otherwise delay every response by a delayed-ACK timeout.
+    disable_nagle_algorithm = True
+    server: FrameServer
+
+    image_content_type = (
+        mimetypes.guess_type(f"frame.{config.output_file_format}")[0]
+        or "application/octet-stream"
+    )
+
+    def log_request(self, code: int | str = "-", size: int | str = "-") -> None:
+        # Logging every request would dominate the cost of serving from memory;
+        # errors are still logged through log_error.
+        pass
+
+    def do_HEAD(self) -> None:
+        self._handle(send_body=False)
+
+    def do_GET(self) -> None:
+        self._handle(send_body=True)
+
+    def _handle(self, *, send_body: bool) -> None:
+        self.send_body = send_body
+        url = urlsplit(self.path)
+        parts = [unquote(part) for part in url.path.strip("/").split("/")]
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+
+        try:
+            match parts:
+                case ["cameras"]:
+                    self._send_cameras()
+                case ["cameras", camera, "latest"]:
+                    self._send_latest(camera)
+                case ["cameras", camera, "frames", timestamp]:
+                    self._send_frame_at(camera, _parse_timestamp(timestamp))
+                case ["cameras", camera, "clip"]:
+                    self._send_clip(camera, query)
+                case _:
+                    self.send_error(HTTPStatus.NOT_FOUND)
+        except ValueError as e:
+            self.send_error(HTTPStatus.BAD_REQUEST, str(e))
+        except RuntimeError as e:
+            self.log_error("%s", e)
+            self.send_error(HTTPStatus.INTERNAL_SERVER_ERROR)
+
+    def _not_modified(self, etag: str) -> bool:
+        if not _etag_matches(self.headers.get("If-None-Match"), etag):
+            return False
+        self.send_response(HTTPStatus.NOT_MODIFIED)
+        self.send_header("ETag", etag)
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        return True
+
+    def _send_headers(
+        self, content_type: str, content_length: int, etag: str | None = None
+    ) -> None:
+        self.send_response(HTTPStatus.OK)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(content_length))
+        if etag is not None:
+            self.send_header("ETag", etag)
+            self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+
+    def _send_bytes(
+        self, data: bytes, content_type: str, etag: str | None = None
+    ) -> None:
+        self._send_headers(content_type, len(data), etag)
+        if self.send_body:
+            self.wfile.write(data)
+
+    def _send_cameras(self) -> None:
+        body = json.dumps(
+            {
+                camera: {"latest": frame.captured_at.isoformat()}
+                for camera, frame in frame_buffer.cameras().items()
+            }
+        ).encode()
+        self._send_bytes(body, "application/json")
+
+    def _send_latest(self, camera: str) -> None:
+        frame = frame_buffer.latest(camera)
+        if frame is None:
+            self.send_error(HTTPStatus.NOT_FOUND, f"No frames for {camera}")
+            return
+        if self._not_modified(frame.etag):
+            return
+        self._send_bytes(frame.data, self.image_content_type, frame.etag)
+
+    def _send_frame_at(self, camera: str, timestamp: datetime) -> None:
+        frame = frame_buffer.at(camera, timestamp)
+        if frame is not None:
+            if not self._not_modified(frame.etag):
+                self._send_bytes(frame.data, self.image_content_type, frame.etag)
+            return
+
+        frames = Image.latest_frames(camera, 1, timestamp)
+        if not frames:
+            self.send_error(
+                HTTPStatus.NOT_FOUND, f"No frame for {camera} at {timestamp}"
+            )
+            return
+
+        captured_at, path = frames[0]
+        try:
+            data = path.read_bytes()
+        except FileNotFoundError:
+            self.send_error(HTTPStatus.NOT_FOUND, f"Frame file missing for {camera}")
+            return
+        etag = stored_frame_etag(camera, _localize(captured_at), data)
+        if self._not_modified(etag):
+            return
+        self._send_bytes(data, self.image_content_type, etag)
+
+    def _send_clip(self, camera: str, query: dict[str, str]) -> None:
+        to_date = (
+            _parse_timestamp(query["to"]) if "to" in query else datetime.now(tz=NL_TZ)
+        )
+        from_date = (
+            _parse_timestamp(query["from"])
+            if "from" in query
+            else to_date - DEFAULT_CLIP_DURATION
+        )
+        framerate = int(query.get("framerate", 12))
+        if framerate <= 0:
+            raise ValueError("framerate must be positive")
+        include_timestamp = query.get("include_timestamp", "").lower() in (
+            "1",
+            "true",
+            "yes",
+        )
+        (profile,) = get_encoder_profiles(
+            [query.get("profile", config.serve_clip_profile)]
+        )
+
+        frames = Image.list_frames(camera, from_date, to_date)
+        if not frames:
+            self.send_error(HTTPStatus.NOT_FOUND, "No frames in the requested range")
+            return
+        if len(frames) > config.serve_max_clip_frames:
+            raise ValueError(
+                f"Clip would contain {len(frames)} frames; "
+                f"the limit is {config.serve_max_clip_frames}"
+            )
+
+        # The key is derived from the frames and options alone, so revalidation
+        # can be answered without rendering or touching the cache.
+        etag = f'"{cache_key(frames, profile, framerate, include_timestamp)}"'
+        if self._not_modified(etag):
+            return
+
+        # A concurrent prune can evict the entry between rendering and opening
+        # it; render once more before giving up.
+        for _ in range(2):
+            with self.server.render_lock:
+                _, clip_path = render_cached(
+                    frames,
+                    profile,
+                    framerate=framerate,
+                    include_timestamp=include_timestamp,
+                )
+            try:
+                f = clip_path.open("rb")
+            except FileNotFoundError:
+                continue
+            break
+        else:
+            raise RuntimeError(f"Rendered clip {clip_path.name} disappeared")
+
+        content_type = (
+            mimetypes.guess_type(clip_path.name)[0] or "application/octet-stream"
+        )
+        with f:
+            self._send_headers(content_type, os.fstat(f.fileno()).st_size, etag)
+            if self.send_body:
+                shutil.copyfileobj(f, self.wfile)
+
+
+def create_server(host: str, port: int) -> FrameServer:
+    return FrameServer((host, port))
+
+
+__all__ = [
+    "FrameServer",
+    "create_server",
+    "refresh_frame_buffer",
+    "warm_frame_buffer",
+]
@@ -2,12 +2,15 @@ import os
 import shlex
 import tempfile
 from collections.abc import Callable
+from contextlib import ExitStack
 from datetime import datetime
 from pathlib import Path
 
 import ffmpeg
 from sqlalchemy import Select, func, select
 
+from . import render_cache
+from .config import EncoderProfile, config
 from .models import Image
 
 type FrameSelector = Callable[[Select], Select]
@@ -73,26 +76,38 @@ def _build_concat_file(
     return "\n".join(lines) + "\n"
 
 
-def create_timelapse(
+def get_encoder_profiles(names: list[str] | None = None) -> list[EncoderProfile]:
+    if names is None:
+        names = config.timelapse_profiles
+
+    try:
+        return [config.encoder_profiles[name] for name in names]
+    except KeyError as e:
+        raise ValueError(f"Unknown encoder profile: {e.args[0]}") from e
+
+
+def _apply_profile_filters(
+    stream: ffmpeg.nodes.FilterableStream, profile: EncoderProfile
+) -> ffmpeg.nodes.FilterableStream:
+    if profile.fps is not None:
+        stream = stream.filter("fps", fps=profile.fps)
+    if profile.height is not None:
+        stream = stream.filter("scale", -2, f"min({profile.height},ih)")
+    if profile.codec == "gif":
+        split = stream.split()
+        palette = split[1].filter("palettegen")
+        stream = ffmpeg.filter([split[0], palette], "paletteuse")
+    return stream
+
+
+def _render(
+    frames: list[tuple[datetime, Path]],
+    outputs: list[tuple[EncoderProfile, Path]],
     *,
-    camera: str,
-    from_date: datetime,
-    to_date: datetime,
-    output_path: Path,
     framerate: int,
     include_timestamp: bool,
-    frame_selector: FrameSelector = all_frames,
 ) -> None:
-    print(f"Creating timelapse for {camera} from {from_date} to {to_date}")
-
-    frames = Image.list_frames(
-        camera, from_date, to_date, frame_selector=frame_selector
-    )
-
-    if not frames:
-        raise ValueError("No images found for the specified time range.")
-
-    output_path.mkdir(parents=True, exist_ok=True)
+    """Render every output in a single ffmpeg pass, decoding the frames only once."""
 
     concat_content = _build_concat_file(frames, framerate)
 
@@ -120,9 +135,21 @@ def create_timelapse(
                 bordercolor="white",
             )
 
+        if len(outputs) > 1:
+            split = pipeline.split()
+            streams = [split[i] for i in range(len(outputs))]
+        else:
+            streams = [pipeline]
+
         try:
-            pipeline.output(
-                str(output_path / f"{camera}.mp4"),
+            ffmpeg.merge_outputs(
+                *(
+                    _apply_profile_filters(stream, profile).output(
+                        str(output_file),
+                        **profile.output_options(),
+                    )
+                    for stream, (profile, output_file) in zip(streams, outputs)
+                )
             ).run(
                 overwrite_output=True,
                 capture_stdout=True,
@@ -132,3 +159,132 @@ def create_timelapse(
             raise RuntimeError(f"ffmpeg error: {e.stderr.decode()}") from e
     finally:
         os.unlink(concat_file_path)
+
+
+def cache_key(
+    frames: list[tuple[datetime, Path]],
+    profile: EncoderProfile,
+    framerate: int,
+    include_timestamp: bool,
+) -> str:
+    """Return the render cache key for encoding `frames` with `profile`."""
+    return render_cache.render_key(
+        frames,
+        framerate=framerate,
+        include_timestamp=include_timestamp,
+        encoder_options=profile.model_dump(exclude={"suffix"}),
+    )
+
+
+def create_timelapse(
+    *,
+    camera: str,
+    from_date: datetime,
+    to_date: datetime,
+    output_path: Path,
+    framerate: int,
+    include_timestamp: bool,
+    frame_selector: FrameSelector = all_frames,
+    profiles: list[EncoderProfile] | None = None,
+    use_cache: bool = True,
+) -> None:
+    print(f"Creating timelapse for {camera} from {from_date} to {to_date}")
+
+    if profiles is None:
+        profiles = get_encoder_profiles()
+
+    outputs = [
+        (profile, output_path / f"{camera}{profile.suffix}.{profile.extension}")
+        for profile in profiles
+    ]
+    if len({output_file for _, output_file in outputs}) != len(outputs):
+        raise ValueError("Encoder profiles must produce distinct output files.")
+
+    frames = Image.list_frames(
+        camera, from_date, to_date, frame_selector=frame_selector
+    )
+
+    if not frames:
+        raise ValueError("No images found for the specified time range.")
+
+    output_path.mkdir(parents=True, exist_ok=True)
+
+    if not use_cache:
+        # Existing outputs may be hardlinks into the cache; don't write through them.
+        for _, output_file in outputs:
+            output_file.unlink(missing_ok=True)
+        _render(
+            frames,
+            outputs,
+            framerate=framerate,
+            include_timestamp=include_timestamp,
+        )
+        return
+
+    # Profiles that differ only in suffix share a key; render those once and
+    # link the result to each of their output files.
+    pending: dict[str, tuple[EncoderProfile, list[Path]]] = {}
+    for profile, output_file in outputs:
+        key = cache_key(frames, profile, framerate, include_timestamp)
+        if key in pending:
+            pending[key][1].append(output_file)
+            continue
+
+        cached_file = render_cache.lookup(key, output_file.suffix)
+        if cached_file is None:
+            pending[key] = (profile, [output_file])
+            continue
+
+        print(f"Using cached render for {output_file.name}")
+        render_cache.link_into(cached_file, output_file)
+
+    if not pending:
+        return
+
+    with ExitStack() as stack:
+        _render(
+            frames,
+            [
+                (
+                    profile,
+                    stack.enter_context(
+                        render_cache.store(key, f".{profile.extension}")
+                    ),
+                )
+                for key, (profile, _) in pending.items()
+            ],
+            framerate=framerate,
+            include_timestamp=include_timestamp,
+        )
+    for key, (profile, output_files) in pending.items():
+        for output_file in output_files:
+            render_cache.link_into(
+                render_cache.entry_path(key, f".{profile.extension}"), output_file
+            )
+    render_cache.prune(max_size=config.timelapse_cache_max_size)
+
+
+def render_cached(
+    frames: list[tuple[datetime, Path]],
+    profile: EncoderProfile,
+    *,
+    framerate: int,
+    include_timestamp: bool,
+) -> tuple[str, Path]:
+    """Return the cache key and cached file for a render, encoding it on a miss."""
+    key = cache_key(frames, profile, framerate, include_timestamp)
+    suffix = f".{profile.extension}"
+
+    cached_file = render_cache.lookup(key, suffix)
+    if cached_file is not None:
+        return key, cached_file
+
+    with render_cache.store(key, suffix) as tmp_file:
+        _render(
+            frames,
+            [(profile, tmp_file)],
+            framerate=framerate,
+            include_timestamp=include_timestamp,
+        )
+    render_cache.prune(max_size=config.timelapse_cache_max_size)
+    return key, render_cache.entry_path(key, suffix)
@@ -1,7 +1,7 @@
 import json
 import re
 from datetime import datetime
-from functools import lru_cache
+from functools import cache, lru_cache
 from pathlib import Path
 from zoneinfo import ZoneInfo
 
@@ -11,16 +11,20 @@ from bs4 import BeautifulSoup
 from pydantic import BaseModel
 
 from .config import config
+from .frame_buffer import frame_buffer
 from .models import Image
 
 WEBCAMS_PAGE = "https://ntvplus.ca/pages/webcams"
 WEBCAM_URL_PREFIX = "https://ntvplus.ca/pages/webcam-"
 
-session = httpx.Client(
-    headers={
-        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36"
-    }
-)
+
+@cache
+def get_session() -> httpx.Client:
+    return httpx.Client(
+        headers={
+            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36"
+        }
+    )
 
 
 class Camera(BaseModel):
@@ -50,7 +54,7 @@ def list_cameras() -> list[Camera]:
         Camera(name="St. Philip's - Bell Island", slug="stphilips-bellisland"),
     ]
 
-    cameras_page = session.get(WEBCAMS_PAGE)
+    cameras_page = get_session().get(WEBCAMS_PAGE)
     cameras_page.raise_for_status()
 
     soup = BeautifulSoup(cameras_page.text, "html.parser")
@@ -74,7 +78,7 @@ def list_cameras() -> list[Camera]:
 
 @lru_cache
 def get_stream_iframe_url(camera: Camera) -> str:
-    camera_page = session.get(WEBCAM_URL_PREFIX + camera.slug)
+    camera_page = get_session().get(WEBCAM_URL_PREFIX + camera.slug)
     camera_page.raise_for_status()
 
     soup = BeautifulSoup(camera_page.text, "html.parser")
@@ -89,7 +93,7 @@ def get_stream_iframe_url(camera: Camera) -> str:
 
 @lru_cache
 def get_stream_hls_url(iframe_url: str) -> str:
-    stream_page = session.get(iframe_url)
+    stream_page = get_session().get(iframe_url)
     stream_page.raise_for_status()
 
     soup = BeautifulSoup(stream_page.text, "html.parser")
@@ -133,6 +137,8 @@ def save_camera_image(camera: Camera) -> None:
 
     save_stream_frame(stream_hls_url, output_path)
     Image.add(camera.slug, timestamp, relative_path)
+    if frame_buffer.enabled:
+        frame_buffer.publish(camera.slug, timestamp, output_path.read_bytes())
 
     print("Saved image for", camera.name)
 